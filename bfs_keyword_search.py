@@ -6,17 +6,288 @@ This script crawls a web page using Playwright, performs a breadth-first search
 through the DOM, and identifies links containing a specific keyword.
 """
 
+import io
 import os
 import sys
+import html
 import json
 import re
+import tarfile
 import time
 import asyncio
+import functools
+from pathlib import Path
 from urllib.parse import urlparse, urljoin
-from collections import defaultdict, deque
-from playwright.async_api import async_playwright
+from collections import defaultdict
+from itertools import count, islice
+from dataclasses import dataclass
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 
-async def scrape_and_search(url, keyword, output_dir=None):
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@dataclass(slots=True)
+class Href:
+    """A single link collected during the BFS traversal."""
+    url: str
+    text: str
+    tag: str
+    is_anchor: bool
+
+
+class BrowserPool:
+    """
+    Shared Playwright browser that hands out fresh contexts per request.
+
+    Launching Chromium costs one to two seconds; the pool pays that cost once
+    and keeps the browser warm, creating an isolated BrowserContext for each
+    scrape instead of a whole new browser.
+    """
+
+    def __init__(self):
+        self._playwright = None
+        self.browser = None
+        self._lock = asyncio.Lock()
+
+    async def get_context(self):
+        """
+        Return a fresh BrowserContext, launching the browser on first use.
+
+        Returns:
+            BrowserContext: An isolated context; callers should close it
+                            (not the browser) when they are done.
+        """
+        async with self._lock:
+            if self.browser is None:
+                self._playwright = await async_playwright().start()
+                self.browser = await self._playwright.chromium.launch(headless=True)
+        return await self.browser.new_context()
+
+    async def shutdown(self):
+        """Close the browser and stop Playwright."""
+        async with self._lock:
+            if self.browser is not None:
+                await self.browser.close()
+                self.browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+# Module-level pool shared by all scrapes in the process
+_pool = BrowserPool()
+
+
+# Resource types the browser never needs to download for link extraction.
+# Stylesheets are kept: anchor innerText still honors CSS visibility.
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font'})
+
+
+async def _block_heavy_resources(route):
+    """Abort requests for resources that link extraction never looks at."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class PagePool:
+    """
+    Pool of pre-warmed pages, each in its own BrowserContext.
+
+    Even with a warm browser, creating a fresh context and page per URL
+    costs 50-200 ms. The pool creates a fixed set of context/page pairs
+    once and rotates them between scrapes. Every pooled page owns its
+    context, so concurrent scrapes never share a cookie jar and clearing
+    cookies on release only resets the page being handed back.
+    """
+
+    def __init__(self, browser_pool=None, size=5):
+        self._browser_pool = browser_pool
+        self.size = size
+        self._contexts = []
+        self._pages = asyncio.Queue()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Take a pre-warmed page, creating the contexts and pages on first use."""
+        async with self._lock:
+            if not self._contexts:
+                pool = self._browser_pool if self._browser_pool is not None else _pool
+                for _ in range(self.size):
+                    context = await pool.get_context()
+                    await context.route("**/*", _block_heavy_resources)
+                    self._contexts.append(context)
+                    self._pages.put_nowait(await context.new_page())
+        return await self._pages.get()
+
+    async def release(self, page):
+        """Clear per-page state and return the page to the pool."""
+        # Scoped to this page only - each pooled page has its own context
+        await page.context.clear_cookies()
+        self._pages.put_nowait(page)
+
+    async def shutdown(self):
+        """Close the per-page contexts and discard the pooled pages."""
+        async with self._lock:
+            for context in self._contexts:
+                await context.close()
+            self._contexts = []
+            self._pages = asyncio.Queue()
+
+
+# Module-level page pool backed by the shared browser pool
+_page_pool = PagePool()
+
+# Per-process counter making default output directories unique: batch
+# scrapes of one domain can finish within the same strftime second
+_dir_counter = count(1)
+
+
+# Image file extensions to exclude from href collection
+_IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.svg', '.ico')
+
+# Href schemes/prefixes that never lead to a crawlable page
+_SKIP_HREF_PREFIXES = ('#', 'javascript:', 'mailto:', 'tel:')
+
+# Elements whose subtrees cannot contain links worth collecting
+_SKIP_TAGS = frozenset({'SCRIPT', 'STYLE', 'NOSCRIPT', 'SVG', 'CANVAS', 'TEMPLATE'})
+
+# Social media sharing links to exclude from keyword analysis
+_SHARE_RE = re.compile(
+    r'facebook\.com/sharer|twitter\.com/intent/tweet|'
+    r'whatsapp\.com/send|telegram\.me/share',
+    re.IGNORECASE
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _get_keyword_regex(keyword):
+    """Compile (and cache) the word-boundary regex for a keyword."""
+    return re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
+
+
+# Replacement template for keyword highlighting in HTML reports
+_HL_TEMPLATE = r'<span class="highlight">\1</span>'
+
+
+@functools.lru_cache(maxsize=256)
+def _get_highlight_regex(keyword):
+    """Compile (and cache) the capture-group regex used for highlighting."""
+    return re.compile(r'(?i)\b(' + re.escape(keyword) + r')\b')
+
+
+@functools.lru_cache(maxsize=256)
+def _get_keyword_path_regex(keyword):
+    """Compile (and cache) the regex matching a path that is only the keyword."""
+    return re.compile(r'/+' + re.escape(keyword) + r'/*', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=8192)
+def _cached_urljoin(base, href):
+    """Memoized urljoin - hrefs repeat heavily on typical pages."""
+    return urljoin(base, href)
+
+
+@functools.lru_cache(maxsize=4096)
+def _fast_normalize(url):
+    """
+    Split a URL into its base, query and fragment without a full urlparse.
+
+    Many hrefs repeat across levels, so results are cached.
+
+    Args:
+        url (str): The URL to split
+
+    Returns:
+        tuple: (base, query, fragment) where base is the URL up to the
+               first '?' or '#'.
+    """
+    base, _, fragment = url.partition('#')
+    base, _, query = base.partition('?')
+    return base, query, fragment
+
+
+@functools.lru_cache(maxsize=4096)
+def _url_path(base):
+    """Extract the path component of a URL that has no query or fragment."""
+    scheme_end = base.find('://')
+    if scheme_end == -1:
+        return base
+    path_start = base.find('/', scheme_end + 3)
+    if path_start == -1:
+        return ''
+    return base[path_start:]
+
+
+@functools.lru_cache(maxsize=8192)
+def _path_keyword_state(path, keyword):
+    """
+    Classify a URL path against the keyword.
+
+    The same paths reappear across BFS levels (navigation links show up on
+    every page), so the regex checks are memoized on (path, keyword).
+
+    Args:
+        path (str): URL path with query and fragment already stripped
+        keyword (str): Keyword to search for
+
+    Returns:
+        int: 0 if the keyword is not in the path, 1 if the keyword is the
+             entire path, 2 if the keyword appears elsewhere in the path.
+    """
+    if not _get_keyword_regex(keyword).search(path):
+        return 0
+    if _get_keyword_path_regex(keyword).fullmatch(path):
+        return 1
+    return 2
+
+
+async def _write_text(path, data):
+    """Write text to a file in a worker thread, off the event loop."""
+    await asyncio.to_thread(Path(path).write_text, data, encoding='utf-8')
+
+
+def _json_bytes(obj):
+    """Serialize obj to indented JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _dump_json(obj, path):
+    """Write obj to path as indented JSON, using orjson when available."""
+    Path(path).write_bytes(_json_bytes(obj))
+
+
+def _write_archive(path, artifacts):
+    """
+    Write named artifact blobs into a single tar file.
+
+    Args:
+        path (str): Path of the tar file to create
+        artifacts (dict): Mapping of member name to bytes content
+    """
+    mtime = int(time.time())
+    with tarfile.open(path, 'w') as tar:
+        for name, data in artifacts.items():
+            info = tarfile.TarInfo(name=name)
+            info.size = len(data)
+            info.mtime = mtime
+            tar.addfile(info, io.BytesIO(data))
+
+
+async def shutdown():
+    """Close the shared page and browser pools at program exit."""
+    await _page_pool.shutdown()
+    await _pool.shutdown()
+
+
+async def scrape_and_search(url, keyword, output_dir=None, pool=None, save_snapshot=True,
+                            archive=False, page=None):
     """
     Scrape a web page, perform a BFS traversal of the DOM, and search for a keyword.
     
@@ -24,7 +295,19 @@ async def scrape_and_search(url, keyword, output_dir=None):
         url (str): The URL to scrape
         keyword (str): The keyword to search for
         output_dir (str, optional): Directory to save results
-    
+        pool (PagePool, optional): Page pool to use. Defaults to the
+                                   shared module-level pool.
+        save_snapshot (bool): Whether to write dom_snapshot.json. Skipping
+                              the dump avoids the serialization cost when
+                              only the search results are wanted.
+        archive (bool): When True, bundle all artifacts into a single
+                        artifacts.tar in the output directory instead of
+                        writing them as separate files - one write instead
+                        of five, which matters on network filesystems.
+        page (Page, optional): Page to reuse instead of acquiring one
+                               from the pool, e.g. when several same-origin
+                               URLs are scraped back to back.
+
     Returns:
         dict: Results of the search including:
             - output_dir: Directory where results are saved
@@ -35,48 +318,78 @@ async def scrape_and_search(url, keyword, output_dir=None):
             - highest_ratio: The ratio value of keyword matches at the highest level
             - best_selected_urls: List of best matching URLs (identical to highest_level_urls, provided for clarity)
     """
-    # Create output directory
+    # Create output directory. The counter keeps same-origin URLs scraped
+    # back to back (which easily finish within one strftime second) from
+    # landing in the same directory and overwriting each other's
+    # fixed-name artifacts.
     if not output_dir:
         parsed_url = urlparse(url)
         domain = parsed_url.netloc
         timestamp = time.strftime("%Y%m%d_%H%M%S")
-        output_dir = f"{domain}_{timestamp}"
+        output_dir = f"{domain}_{timestamp}_{next(_dir_counter)}"
     
     os.makedirs(output_dir, exist_ok=True)
-    
+
+    # In archive mode, artifacts are collected here and written as one tar
+    artifacts = {}
+
     # Save URL to a file
-    url_path = os.path.join(output_dir, "url.txt")
-    with open(url_path, 'w', encoding='utf-8') as f:
-        f.write(url)
-    
-    # Launch Playwright and get DOM snapshot
-    print(f"Launching browser and navigating to {url}")
-    dom_snapshot = await get_dom_snapshot(url)
+    if archive:
+        artifacts['url.txt'] = url.encode('utf-8')
+    else:
+        url_path = os.path.join(output_dir, "url.txt")
+        await _write_text(url_path, url)
+
+    # Get a DOM snapshot using the shared browser pool. page.evaluate
+    # already returns Python objects, so the snapshot is handed straight
+    # to the traversal below with no JSON round-trip; the only place it
+    # is ever serialized is the optional dom_snapshot.json dump.
+    print(f"Navigating to {url}")
+    dom_snapshot = await get_dom_snapshot(url, pool, page=page)
     
     # Save DOM snapshot to file
-    snapshot_path = os.path.join(output_dir, "dom_snapshot.json")
-    with open(snapshot_path, 'w', encoding='utf-8') as f:
-        json.dump(dom_snapshot, f, ensure_ascii=False, indent=2)
-    print(f"DOM snapshot saved to {snapshot_path}")
-    
+    if save_snapshot:
+        if archive:
+            artifacts['dom_snapshot.json'] = await asyncio.to_thread(_json_bytes, dom_snapshot)
+        else:
+            snapshot_path = os.path.join(output_dir, "dom_snapshot.json")
+            await asyncio.to_thread(_dump_json, dom_snapshot, snapshot_path)
+            print(f"DOM snapshot saved to {snapshot_path}")
+
     # Perform BFS traversal
     print("Performing BFS traversal to find hrefs by level")
     level_hrefs = bfs_traverse_dom(dom_snapshot, url)
-    
+
     # Save BFS traversal results
-    bfs_txt_path = os.path.join(output_dir, "bfs_hrefs_by_level.txt")
-    bfs_html_path = os.path.join(output_dir, "bfs_hrefs_by_level.html")
-    save_bfs_results(level_hrefs, url, bfs_txt_path, bfs_html_path)
-    
+    if archive:
+        bfs_txt, bfs_html = _render_bfs_results(level_hrefs, url)
+        artifacts['bfs_hrefs_by_level.txt'] = bfs_txt.encode('utf-8')
+        artifacts['bfs_hrefs_by_level.html'] = bfs_html.encode('utf-8')
+    else:
+        bfs_txt_path = os.path.join(output_dir, "bfs_hrefs_by_level.txt")
+        bfs_html_path = os.path.join(output_dir, "bfs_hrefs_by_level.html")
+        await asyncio.to_thread(save_bfs_results, level_hrefs, url, bfs_txt_path, bfs_html_path)
+
     # Search for keyword
     print(f"Searching for keyword '{keyword}' in hrefs")
     keyword_results = search_keyword_in_hrefs(level_hrefs, keyword)
-    
+
     # Save keyword search results
-    keyword_txt_path = os.path.join(output_dir, f"keyword_search_{keyword}.txt")
-    keyword_html_path = os.path.join(output_dir, f"keyword_search_{keyword}.html")
-    save_keyword_results(keyword_results, keyword, url, keyword_txt_path, keyword_html_path)
-    
+    if archive:
+        kw_txt, kw_html = _render_keyword_results(keyword_results, keyword, url)
+        artifacts[f'keyword_search_{keyword}.txt'] = kw_txt.encode('utf-8')
+        artifacts[f'keyword_search_{keyword}.html'] = kw_html.encode('utf-8')
+    else:
+        keyword_txt_path = os.path.join(output_dir, f"keyword_search_{keyword}.txt")
+        keyword_html_path = os.path.join(output_dir, f"keyword_search_{keyword}.html")
+        await asyncio.to_thread(save_keyword_results, keyword_results, keyword, url, keyword_txt_path, keyword_html_path)
+
+    # In archive mode, everything lands in one tar with a single write
+    if archive:
+        archive_path = os.path.join(output_dir, "artifacts.tar")
+        await asyncio.to_thread(_write_archive, archive_path, artifacts)
+        print(f"Artifacts archived to {archive_path}")
+
     # Get the highest level and its URLs (URLs with highest keyword ratio)
     target_level = keyword_results.get('target_level') if keyword_results else None
     best_matches = keyword_results.get('best_matches', []) if keyword_results else []
@@ -92,167 +405,274 @@ async def scrape_and_search(url, keyword, output_dir=None):
         'best_selected_urls': best_matches  # Explicit name for clarity
     }
 
-async def get_dom_snapshot(url):
+async def scrape_and_search_batch(urls, keyword, max_concurrency=5, pool=None):
+    """
+    Scrape several URLs concurrently and search each for a keyword.
+
+    URLs are grouped by origin: each origin gets one pooled page and is
+    scraped sequentially on it, so per-site state (cookie consent, cached
+    assets, warm connections) is paid once per origin instead of once per
+    URL. Distinct origins run in parallel, bounded by a semaphore so at
+    most max_concurrency scrapes are in flight at once.
+
+    Args:
+        urls (list): The URLs to scrape
+        keyword (str): The keyword to search for
+        max_concurrency (int): Maximum number of concurrent scrapes
+        pool (PagePool, optional): Page pool to share across workers.
+                                   Defaults to the shared module-level pool.
+
+    Returns:
+        list: One entry per URL, in order - either the scrape_and_search
+              result dict or the exception raised for that URL.
+    """
+    if pool is None:
+        pool = _page_pool
+
+    sem = asyncio.Semaphore(max_concurrency)
+
+    # Group input indices by origin, preserving input order within groups
+    by_origin = defaultdict(list)
+    for idx, u in enumerate(urls):
+        by_origin[urlparse(u).netloc].append(idx)
+
+    results = [None] * len(urls)
+
+    async def _origin_worker(indices):
+        page = await pool.acquire()
+        try:
+            for idx in indices:
+                async with sem:
+                    try:
+                        results[idx] = await scrape_and_search(
+                            urls[idx], keyword, pool=pool, page=page)
+                    except Exception as exc:
+                        results[idx] = exc
+        finally:
+            await pool.release(page)
+
+    await asyncio.gather(*[_origin_worker(indices)
+                           for indices in by_origin.values()])
+    return results
+
+
+async def get_dom_snapshot(url, pool=None, page=None):
     """
     Get a DOM snapshot of a web page using Playwright.
-    
+
     Args:
         url (str): The URL to navigate to
-    
+        pool (PagePool, optional): Page pool to use. Defaults to the
+                                   shared module-level pool.
+        page (Page, optional): Page to reuse instead of acquiring one
+                               from the pool. The caller keeps ownership
+                               and is responsible for releasing it.
+
     Returns:
-        dict: DOM snapshot as a dictionary
+        dict: Flat DOM snapshot with parallel arrays 'tags', 'hrefs',
+              'texts', 'parents' and 'levels', one entry per element node.
     """
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page()
-        
-        # Navigate to the URL
-        await page.goto(url, wait_until="networkidle")
-        
-        # Take a screenshot
-        await page.screenshot(path=os.path.join(os.path.dirname(url), "screenshot.png"), full_page=True)
-        
-        # Get DOM snapshot
-        dom_snapshot = await page.evaluate("""() => {
-            function serializeNode(node) {
-                if (!node) return null;
-                
-                const serialized = {
-                    nodeType: node.nodeType,
-                };
-                
-                if (node.nodeType === Node.ELEMENT_NODE) {
-                    serialized.tagName = node.tagName;
-                    serialized.attributes = {};
-                    for (const attr of node.attributes) {
-                        serialized.attributes[attr.name] = attr.value;
-                    }
-                    
-                    // Capture the rendered text content for all elements
-                    const computedStyle = window.getComputedStyle(node);
-                    if (computedStyle.display !== 'none' && computedStyle.visibility !== 'hidden') {
-                        serialized.displayedText = node.innerText || '';
-                    }
-                    
-                    // For special cases like links, capture the href and text specially
-                    if (node.tagName === 'A') {
-                        serialized.linkText = node.textContent || '';
-                        serialized.linkHref = node.href || '';
-                    }
-                } else if (node.nodeType === Node.TEXT_NODE) {
-                    serialized.textContent = node.textContent || '';
-                } else if (node.nodeType === Node.COMMENT_NODE) {
-                    serialized.comment = node.textContent || '';
-                }
-                
-                // Check for CSS-generated content
-                if (node.nodeType === Node.ELEMENT_NODE) {
-                    try {
-                        const before = window.getComputedStyle(node, '::before').content;
-                        const after = window.getComputedStyle(node, '::after').content;
-                        if (before && before !== 'none') serialized.beforeContent = before;
-                        if (after && after !== 'none') serialized.afterContent = after;
-                    } catch (e) {
-                        // Ignore errors from getComputedStyle
-                    }
+    if page is not None:
+        return await _snapshot_on_page(page, url)
+
+    if pool is None:
+        pool = _page_pool
+
+    page = await pool.acquire()
+    try:
+        return await _snapshot_on_page(page, url)
+    finally:
+        # Hand the page back to the pool - the context stays warm
+        await pool.release(page)
+
+
+async def _snapshot_on_page(page, url):
+    """Navigate an already-acquired page to a URL and snapshot its DOM."""
+    # Navigate to the URL. Don't wait for network idle - ad- and
+    # tracker-heavy pages may never go quiet and would burn the full
+    # navigation timeout. DOM content plus a short wait for anchors
+    # to appear is enough for link extraction.
+    page.set_default_navigation_timeout(15000)
+    await page.goto(url, wait_until="domcontentloaded", timeout=15000)
+    try:
+        await page.wait_for_selector('a', timeout=5000)
+    except PlaywrightTimeoutError:
+        pass  # A page without links is still worth snapshotting
+
+    # Serialize the DOM with an iterative in-page BFS that emits flat
+    # parallel arrays. Compared to the old recursive nested-object
+    # serializer this ships a far smaller payload over CDP and skips
+    # per-node getComputedStyle probes, which force style resolution.
+    return await page.evaluate("""() => {
+            // Subtrees that cannot contain links worth collecting
+            const SKIP_TAGS = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT',
+                                       'SVG', 'CANVAS', 'TEMPLATE']);
+            const tags = [];
+            const hrefs = [];
+            const texts = [];
+            const parents = [];
+            const levels = [];
+
+            const queue = [[document.documentElement, 0, -1]];
+            let head = 0;
+            while (head < queue.length) {
+                const [node, level, parent] = queue[head++];
+                const i = tags.length;
+                tags.push(node.tagName);
+                parents.push(parent);
+                levels.push(level);
+
+                const href = node.getAttribute('href');
+                if (href) {
+                    hrefs.push(href);
+                    // innerText forces layout, so only read it for anchors
+                    // (where rendered text matters); textContent is free.
+                    const text = node.tagName === 'A'
+                        ? (node.innerText || node.textContent)
+                        : node.textContent;
+                    texts.push((text || node.getAttribute('title') || '').trim());
+                } else {
+                    hrefs.push('');
+                    texts.push('');
                 }
-                
-                if (node.childNodes.length > 0) {
-                    serialized.children = [];
-                    for (const child of node.childNodes) {
-                        const serializedChild = serializeNode(child);
-                        if (serializedChild) {
-                            serialized.children.push(serializedChild);
-                        }
+
+                if (!SKIP_TAGS.has(node.tagName.toUpperCase())) {
+                    for (const child of node.children) {
+                        queue.push([child, level + 1, i]);
                     }
                 }
-                
-                return serialized;
             }
-            
-            return serializeNode(document.documentElement);
+
+            return {tags: tags, hrefs: hrefs, texts: texts,
+                    parents: parents, levels: levels};
         }""")
-        
-        # Get the page HTML
-        html_content = await page.content()
-        
-        # Get the page text
-        page_text = await page.evaluate("() => document.body.innerText")
-        
-        # Save HTML and page text
-        output_dir = os.path.dirname(url)
-        with open(os.path.join(output_dir, "page_source.html"), 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        with open(os.path.join(output_dir, "page_text.txt"), 'w', encoding='utf-8') as f:
-            f.write(page_text)
-        
-        await browser.close()
-        
-        return dom_snapshot
+
+def _flatten_snapshot(root):
+    """
+    Flatten a nested DOM snapshot into parallel per-element lists.
+
+    Walks the snapshot once in breadth-first order, keeping only element
+    nodes and appending their tag name, attribute dict, captured text and
+    DOM level to structure-of-arrays style lists. The traversal proper can
+    then iterate the contiguous lists in index order instead of popping
+    (node, level) tuples off a queue and chasing dict lookups per node.
+
+    Args:
+        root (dict): Nested DOM snapshot
+
+    Returns:
+        tuple: (tags, hrefs, texts, levels) parallel lists, one entry per
+               element node.
+    """
+    tags = []
+    hrefs = []
+    texts = []
+    elem_levels = []
+
+    # Growing-list BFS: nodes[i] is processed while children are appended
+    nodes = [root]
+    node_levels = [0]
+    i = 0
+    while i < len(nodes):
+        node = nodes[i]
+        level = node_levels[i]
+
+        if node.get('nodeType') != 1:  # Only element nodes carry hrefs
+            i += 1
+            continue
+
+        tag_name = node.get('tagName', '')
+        attr = node.get('attributes')
+        tags.append(tag_name)
+        hrefs.append(attr.get('href', '') if attr else '')
+        text = node.get('linkText', '') or node.get('displayedText', '')
+        if not text and attr:
+            text = attr.get('title', '')
+        texts.append(text)
+        elem_levels.append(level)
+
+        children = node.get('children')
+        if children and tag_name.upper() not in _SKIP_TAGS:
+            child_level = level + 1
+            for child in children:
+                nodes.append(child)
+                node_levels.append(child_level)
+        i += 1
+
+    return tags, hrefs, texts, elem_levels
+
 
 def bfs_traverse_dom(dom_snapshot, base_url):
     """
     Traverse the DOM snapshot in breadth-first order and extract hrefs by level.
-    
+
     Args:
-        dom_snapshot (dict): DOM snapshot
+        dom_snapshot (dict): DOM snapshot, either the flat parallel-array
+                             form emitted by get_dom_snapshot or the older
+                             nested form (e.g. loaded from disk)
         base_url (str): Base URL for resolving relative links
-    
+
     Returns:
         dict: Dictionary mapping levels to lists of hrefs
     """
-    # Image file extensions to exclude
-    image_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.svg', '.ico']
-    
-    # BFS traversal
-    queue = deque([(dom_snapshot, 0)])  # (node, level)
+    if 'tags' in dom_snapshot:
+        # Flat structure-of-arrays snapshot emitted in-browser
+        tags = dom_snapshot['tags']
+        hrefs = dom_snapshot['hrefs']
+        texts = dom_snapshot['texts']
+        levels = dom_snapshot['levels']
+    else:
+        # Legacy nested snapshot (e.g. an older dom_snapshot.json)
+        tags, hrefs, texts, levels = _flatten_snapshot(dom_snapshot)
+
     level_hrefs = defaultdict(list)
-    
-    # Keep track of unique URLs to avoid duplicates
-    seen_urls = set()
-    
-    while queue:
-        node, level = queue.popleft()
-        
-        # Check if this node is an element
-        if node.get('nodeType') == 1:  # Element node
-            tag_name = node.get('tagName', '')
-            
-            # Check for href attribute
-            if 'attributes' in node:
-                href = node.get('attributes', {}).get('href', '')
-                
-                if href and not href.startswith('#') and not href.startswith('javascript:'):
-                    # Skip image files
-                    if not any(href.lower().endswith(ext) for ext in image_extensions):
-                        # Get link text
-                        link_text = node.get('linkText', '') or node.get('displayedText', '')
-                        if not link_text:
-                            link_text = node.get('attributes', {}).get('title', '') or "[No text]"
-                        
-                        # Create absolute URL
-                        full_url = href
-                        if href and not href.startswith(('http://', 'https://', '//')):
-                            full_url = urljoin(base_url, href)
-                        
-                        # Clean text
-                        if link_text:
-                            link_text = ' '.join(link_text.split())
-                        
-                        # Add to the appropriate level list
-                        level_hrefs[level].append({
-                            'url': full_url,
-                            'text': link_text,
-                            'tag': tag_name,
-                            'element_type': 'anchor' if tag_name.lower() == 'a' else 'element_with_href'
-                        })
-        
-        # Add children to the queue for the next level
-        if 'children' in node and node['children']:
-            for child in node['children']:
-                queue.append((child, level + 1))
-    
+    # O(1) set membership per level to drop exact-duplicate entries
+    # (repeated nav/footer links) instead of carrying them downstream
+    seen_by_level = defaultdict(set)
+
+    for i in range(len(tags)):
+        href = hrefs[i]
+
+        if not href or href.startswith(_SKIP_HREF_PREFIXES):
+            continue
+
+        # Skip image files (single C-level tuple check, lowercase once)
+        href_lower = href.lower()
+        if href_lower.endswith(_IMAGE_EXTS):
+            continue
+
+        tag_name = tags[i]
+
+        # Get link text
+        link_text = texts[i] or "[No text]"
+
+        # Create absolute URL
+        full_url = href
+        if not href.startswith(('http://', 'https://', '//')):
+            full_url = _cached_urljoin(base_url, href)
+
+        # Clean text
+        link_text = ' '.join(link_text.split())
+
+        # Skip exact duplicates within a level. Only identical
+        # (url, text, tag) entries are dropped here - picking between
+        # same-URL links with different text stays in
+        # search_keyword_in_hrefs, which keeps the longest text.
+        level = levels[i]
+        key = (full_url, link_text, tag_name)
+        seen = seen_by_level[level]
+        if key in seen:
+            continue
+        seen.add(key)
+
+        # Add to the appropriate level list
+        level_hrefs[level].append(Href(
+            url=full_url,
+            text=link_text,
+            tag=tag_name,
+            is_anchor=tag_name.lower() == 'a'
+        ))
+
     return level_hrefs
 
 def search_keyword_in_hrefs(level_hrefs, keyword):
@@ -272,7 +692,8 @@ def search_keyword_in_hrefs(level_hrefs, keyword):
     Returns:
         dict: Dictionary of search results
     """
-    keyword_regex = re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
+    # Lowercase the keyword once per run for the substring pre-check below
+    kw_lower = keyword.lower()
     level_stats = {}
     level_matches = {}
     level_debug = {}  # Store debugging info for each level
@@ -289,43 +710,43 @@ def search_keyword_in_hrefs(level_hrefs, keyword):
         # 1. Create unique list of hrefs by normalizing URLs (removing anchors and query params)
         unique_urls = {}
         for href in hrefs:
-            url = href['url']
+            url = href.url
             
             # Skip social media sharing links
-            if any(share_domain in url.lower() for share_domain in [
-                'facebook.com/sharer', 'twitter.com/intent/tweet', 
-                'whatsapp.com/send', 'telegram.me/share'
-            ]):
+            if _SHARE_RE.search(url):
                 debug_info['skipped'][url] = "Social media sharing link"
                 continue
-                
+
+
             # 2. Normalize URL by removing anchor and query parts
-            parsed_url = urlparse(url)
-            
-            # Check if URL has anchor or query (these will be excluded from counting)
-            has_anchor = bool(parsed_url.fragment)
-            has_query = bool(parsed_url.query)
-            
-            # Get base URL without query and fragment
-            normalized_url = parsed_url.scheme + "://" + parsed_url.netloc + parsed_url.path
-            
+            normalized_url, query, fragment = _fast_normalize(url)
+
             # If this URL has an anchor or query, mark it as such for tracking
-            if has_anchor or has_query:
+            if fragment or query:
                 reason = []
-                if has_anchor:
-                    reason.append("Has anchor (#" + parsed_url.fragment + ")")
-                if has_query:
+                if fragment:
+                    reason.append("Has anchor (#" + fragment + ")")
+                if query:
                     reason.append("Has query parameters")
-                
+
                 debug_info['skipped'][url] = ", ".join(reason)
                 continue  # Skip URLs with anchors or queries
-            
+
+            # 4. Skip if the keyword is the entire path (eg. /fire or
+            # /fire/) - cheapest-filter-first: such URLs can never count,
+            # so drop them here instead of carrying them into the
+            # analysis loop. They no longer inflate total_unique_urls.
+            path = _url_path(normalized_url)
+            if kw_lower in path.lower() and _path_keyword_state(path, keyword) == 1:
+                debug_info['skipped'][url] = f"Keyword '{keyword}' is the entire path"
+                continue
+
             # Store in unique URLs dictionary if it hasn't been seen yet or has more text content
-            if normalized_url not in unique_urls or len(href['text']) > len(unique_urls[normalized_url]['text']):
+            if normalized_url not in unique_urls or len(href.text) > len(unique_urls[normalized_url]['text']):
                 unique_urls[normalized_url] = {
-                    'text': href['text'],
-                    'url': href['url'],  # Keep original URL for display
-                    'tag': href['tag'],
+                    'text': href.text,
+                    'url': href.url,  # Keep original URL for display
+                    'tag': href.tag,
                     'normalized_url': normalized_url
                 }
         
@@ -335,21 +756,20 @@ def search_keyword_in_hrefs(level_hrefs, keyword):
         
         # Analyze each unique URL 
         for norm_url, href_data in unique_urls.items():
-            # Parse the URL to get the path
-            parsed_url = urlparse(norm_url)
-            path = parsed_url.path
+            # Extract the path (norm_url has no query or fragment)
+            path = _url_path(norm_url)
             
-            # 3. Check if keyword is in the URL path
-            if not keyword_regex.search(path):
+            # 3. Check if keyword is in the URL path. A plain substring
+            # test (C-level) rejects most paths before the word-boundary
+            # regex runs - the regex can only match if the substring occurs.
+            if kw_lower not in path.lower():
                 debug_info['skipped'][norm_url] = f"Keyword '{keyword}' not in URL path"
                 continue
-                
-            # 4. Check if the keyword is not the entire path
-            path_segments = [segment for segment in path.split('/') if segment]
-            
-            # Skip if the path is just the keyword
-            if len(path_segments) == 1 and keyword_regex.fullmatch(path_segments[0]):
-                debug_info['skipped'][norm_url] = f"Keyword '{keyword}' is the entire path"
+
+            # Rule 4 (keyword is the entire path) was already applied at
+            # normalization time, so only the word-boundary check remains.
+            if _path_keyword_state(path, keyword) == 0:
+                debug_info['skipped'][norm_url] = f"Keyword '{keyword}' not in URL path"
                 continue
             
             # This URL matches all criteria
@@ -402,110 +822,35 @@ def search_keyword_in_hrefs(level_hrefs, keyword):
         'debug_info': level_debug  # Include debug info
     }
 
-def save_bfs_results(level_hrefs, base_url, txt_path, html_path):
-    """
-    Save BFS traversal results to text and HTML files.
-    
-    Args:
-        level_hrefs (dict): Dictionary mapping levels to lists of hrefs
-        base_url (str): Base URL of the page
-        txt_path (str): Path to save text results
-        html_path (str): Path to save HTML results
-    """
-    # Create text output
-    output_lines = [f"BFS Traversal Results - hrefs by level for {base_url}", "=" * 60, ""]
-    
-    for level, hrefs in sorted(level_hrefs.items()):
-        output_lines.append(f"Level {level} - {len(hrefs)} hrefs found")
-        output_lines.append("-" * 40)
-        
-        for i, href in enumerate(hrefs, 1):
-            text = href['text'].strip() if href['text'] else "[No text]"
-            url = href['url']
-            
-            # Truncate very long strings
-            if len(text) > 80:
-                text = text[:77] + "..."
-            if len(url) > 80:
-                url = url[:77] + "..."
-            
-            output_lines.append(f"{i}. [{href['tag']}] {text}")
-            output_lines.append(f"   URL: {url}")
-            output_lines.append("")
-        
-        output_lines.append("")
-    
-    # Save to text file
-    with open(txt_path, 'w', encoding='utf-8') as f:
-        f.write("\n".join(output_lines))
-    
-    # Create HTML output
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <title>BFS Traversal - hrefs by Level for {base_url}</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }}
-        h1, h2 {{ color: #333; }}
-        .level-container {{ margin-bottom: 30px; border: 1px solid #ddd; padding: 15px; border-radius: 5px; }}
-        .level-header {{ background-color: #f5f5f5; padding: 10px; margin-bottom: 15px; border-radius: 3px; }}
-        .href-item {{ margin-bottom: 12px; padding-bottom: 8px; border-bottom: 1px solid #eee; }}
-        .href-text {{ font-weight: bold; margin-bottom: 5px; }}
-        .href-url {{ color: blue; word-break: break-all; }}
-        .href-tag {{ color: #666; font-style: italic; }}
-        .toggle-btn {{ cursor: pointer; padding: 5px 10px; background: #e0e0e0; border: none; border-radius: 3px; margin-right: 10px; }}
-        .href-list {{ max-height: 500px; overflow-y: auto; }}
-        .filter-container {{ margin-bottom: 20px; }}
+# Fixed fragments of the BFS traversal report, hoisted to module scope so
+# each render appends shared constants instead of rebuilding large strings
+_BFS_REPORT_STYLE = """    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }
+        h1, h2 { color: #333; }
+        .level-container { margin-bottom: 30px; border: 1px solid #ddd; padding: 15px; border-radius: 5px; }
+        .level-header { background-color: #f5f5f5; padding: 10px; margin-bottom: 15px; border-radius: 3px; }
+        .href-item { margin-bottom: 12px; padding-bottom: 8px; border-bottom: 1px solid #eee; }
+        .href-text { font-weight: bold; margin-bottom: 5px; }
+        .href-url { color: blue; word-break: break-all; }
+        .href-tag { color: #666; font-style: italic; }
+        .toggle-btn { cursor: pointer; padding: 5px 10px; background: #e0e0e0; border: none; border-radius: 3px; margin-right: 10px; }
+        .href-list { max-height: 500px; overflow-y: auto; }
+        .filter-container { margin-bottom: 20px; }
     </style>
 </head>
 <body>
-    <h1>BFS Traversal - hrefs by Level for {base_url}</h1>
-    <p>This visualization shows href elements found at each DOM level during a breadth-first traversal.</p>
-    
+"""
+
+_BFS_REPORT_FILTER = """    <p>This visualization shows href elements found at each DOM level during a breadth-first traversal.</p>
+
     <div class="filter-container">
         <button class="toggle-btn" onclick="toggleAllLevels()">Toggle All Levels</button>
-        <input type="text" id="hrefFilter" placeholder="Filter by text..." 
+        <input type="text" id="hrefFilter" placeholder="Filter by text..."
                onkeyup="filterHrefs()" style="padding: 5px; width: 300px;">
     </div>
-""")
+"""
 
-        if not level_hrefs:
-            f.write("<p>No href elements were identified.</p>")
-        else:
-            for level, hrefs in sorted(level_hrefs.items()):
-                level_id = f"level{level}"
-                
-                f.write(f"""
-    <div class="level-container" id="container-{level_id}">
-        <div class="level-header">
-            <button class="toggle-btn" onclick="toggleLevel('{level_id}')">Toggle</button>
-            <h2>Level {level} - {len(hrefs)} hrefs found</h2>
-        </div>
-        
-        <div id="{level_id}" class="href-list">
-""")
-                
-                for i, href in enumerate(hrefs, 1):
-                    text = href['text'].strip() if href['text'] else "[No text]"
-                    url = href['url']
-                    tag = href['tag']
-                    
-                    f.write(f"""
-            <div class="href-item">
-                <div class="href-text">{i}. {text}</div>
-                <div class="href-tag">Element: &lt;{tag}&gt;</div>
-                <div class="href-url"><a href="{url}" target="_blank">{url}</a></div>
-            </div>
-""")
-                
-                f.write("""
-        </div>
-    </div>
-""")
-        
-        f.write("""
+_BFS_REPORT_SCRIPT = """
     <script>
         function toggleLevel(levelId) {
             const level = document.getElementById(levelId);
@@ -515,25 +860,25 @@ def save_bfs_results(level_hrefs, base_url, txt_path, html_path):
                 level.style.display = 'none';
             }
         }
-        
+
         function toggleAllLevels() {
             const levels = document.querySelectorAll('.href-list');
             const firstLevel = levels[0];
             const allHidden = firstLevel.style.display === 'none';
-            
+
             levels.forEach(level => {
                 level.style.display = allHidden ? 'block' : 'none';
             });
         }
-        
+
         function filterHrefs() {
             const filterText = document.getElementById('hrefFilter').value.toLowerCase();
             const containers = document.querySelectorAll('.level-container');
-            
+
             containers.forEach(container => {
                 const hrefs = container.querySelectorAll('.href-item');
                 let found = false;
-                
+
                 hrefs.forEach(href => {
                     const text = href.textContent.toLowerCase();
                     if (text.includes(filterText)) {
@@ -543,14 +888,116 @@ def save_bfs_results(level_hrefs, base_url, txt_path, html_path):
                         href.style.display = 'none';
                     }
                 });
-                
+
                 container.style.display = found ? 'block' : 'none';
             });
         }
     </script>
 </body>
 </html>
+"""
+
+
+def _render_bfs_results(level_hrefs, base_url):
+    """
+    Render BFS traversal results as text and HTML documents.
+
+    Args:
+        level_hrefs (dict): Dictionary mapping levels to lists of hrefs
+        base_url (str): Base URL of the page
+
+    Returns:
+        tuple: (text_content, html_content) strings
+    """
+    # Create text output
+    output_lines = [f"BFS Traversal Results - hrefs by level for {base_url}", "=" * 60, ""]
+    
+    for level, hrefs in sorted(level_hrefs.items()):
+        output_lines.append(f"Level {level} - {len(hrefs)} hrefs found")
+        output_lines.append("-" * 40)
+        
+        for i, href in enumerate(hrefs, 1):
+            text = href.text.strip() if href.text else "[No text]"
+            url = href.url
+
+            # Truncate very long strings
+            if len(text) > 80:
+                text = text[:77] + "..."
+            if len(url) > 80:
+                url = url[:77] + "..."
+
+            output_lines.append(f"{i}. [{href.tag}] {text}")
+            output_lines.append(f"   URL: {url}")
+            output_lines.append("")
+        
+        output_lines.append("")
+
+    # Create HTML output - collect chunks and join once at the end.
+    # Fixed fragments are module-level constants; only the lines that
+    # interpolate the base URL are built per call.
+    chunks = []
+    escaped_base_url = html.escape(base_url)
+    chunks.append(f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>BFS Traversal - hrefs by Level for {escaped_base_url}</title>
 """)
+    chunks.append(_BFS_REPORT_STYLE)
+    chunks.append(f"    <h1>BFS Traversal - hrefs by Level for {escaped_base_url}</h1>\n")
+    chunks.append(_BFS_REPORT_FILTER)
+
+    if not level_hrefs:
+        chunks.append("<p>No href elements were identified.</p>")
+    else:
+        for level, hrefs in sorted(level_hrefs.items()):
+            level_id = f"level{level}"
+
+            chunks.append(f"""
+    <div class="level-container" id="container-{level_id}">
+        <div class="level-header">
+            <button class="toggle-btn" onclick="toggleLevel('{level_id}')">Toggle</button>
+            <h2>Level {level} - {len(hrefs)} hrefs found</h2>
+        </div>
+
+        <div id="{level_id}" class="href-list">
+""")
+
+            for i, href in enumerate(hrefs, 1):
+                text = html.escape(href.text.strip() if href.text else "[No text]")
+                url = html.escape(href.url)
+                tag = html.escape(href.tag)
+
+                chunks.append(f"""
+            <div class="href-item">
+                <div class="href-text">{i}. {text}</div>
+                <div class="href-tag">Element: &lt;{tag}&gt;</div>
+                <div class="href-url"><a href="{url}" target="_blank">{url}</a></div>
+            </div>
+""")
+
+            chunks.append("""
+        </div>
+    </div>
+""")
+
+    chunks.append(_BFS_REPORT_SCRIPT)
+
+    return "\n".join(output_lines), "".join(chunks)
+
+def save_bfs_results(level_hrefs, base_url, txt_path, html_path):
+    """
+    Save BFS traversal results to text and HTML files.
+
+    Args:
+        level_hrefs (dict): Dictionary mapping levels to lists of hrefs
+        base_url (str): Base URL of the page
+        txt_path (str): Path to save text results
+        html_path (str): Path to save HTML results
+    """
+    txt_content, html_content = _render_bfs_results(level_hrefs, base_url)
+    Path(txt_path).write_text(txt_content, encoding='utf-8')
+    Path(html_path).write_text(html_content, encoding='utf-8')
 
 def render_excluded_urls_table(f, search_results, target_level):
     """
@@ -607,40 +1054,149 @@ def render_excluded_urls_table(f, search_results, target_level):
     </div>
     """)
 
-def save_keyword_results(search_results, keyword, base_url, txt_path, html_path):
+# Fixed fragments of the keyword search report, hoisted like the BFS ones
+_KEYWORD_REPORT_STYLE = """    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }
+        h1, h2 { color: #333; }
+        .result-container { margin-bottom: 30px; border: 1px solid #ddd; padding: 15px; border-radius: 5px; }
+        .result-header { background-color: #f5f5f5; padding: 10px; margin-bottom: 15px; border-radius: 3px; }
+        .match-item { margin-bottom: 12px; padding: 10px; border-bottom: 1px solid #eee; }
+        .match-text { font-weight: bold; margin-bottom: 5px; }
+        .match-url { color: blue; word-break: break-all; margin-bottom: 3px; }
+        .match-norm-url { color: #555; word-break: break-all; font-style: italic; font-size: 0.9em; margin-bottom: 3px; }
+        .match-path { color: #777; font-family: monospace; margin-bottom: 3px; }
+        .match-tag { color: #666; font-style: italic; margin-top: 5px; }
+        .highlight { background-color: #ffff00; font-weight: bold; }
+        .stats { margin-top: 10px; font-size: 0.9em; color: #555; }
+        .ratio-bar { height: 20px; background-color: #ddd; margin-top: 5px; border-radius: 3px; position: relative; margin-bottom: 15px; }
+        .ratio-fill { height: 100%; background-color: #4CAF50; border-radius: 3px; }
+        .ratio-text { position: absolute; right: 5px; top: 0; font-size: 0.8em; color: #000; }
+        .rules { background-color: #f9f9f9; padding: 10px; border-left: 3px solid #4CAF50; margin: 15px 0; }
+        .level-stats { display: flex; flex-wrap: wrap; gap: 10px; margin-bottom: 20px; }
+        .level-stat-item { border: 1px solid #ddd; padding: 10px; border-radius: 5px; flex-grow: 1; min-width: 200px; }
+        .level-best { background-color: #e8f5e9; }
+        .skipped-container { margin: 20px 0; }
+        .skipped-table { width: 100%; border-collapse: collapse; }
+        .skipped-table th, .skipped-table td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        .skipped-table th { background-color: #f5f5f5; }
+        .skipped-anchor { background-color: #ffe6e6; }
+    </style>
+</head>
+<body>
+"""
+
+_KEYWORD_RULES_HTML = """
+    <div class="rules">
+        <h3>Ranking Rules Applied:</h3>
+        <ol>
+            <li>Only counting unique URLs after removing query parameters and anchors</li>
+            <li>Only counting URLs with keyword in their path (not in query or fragment)</li>
+            <li>Excluding URLs where the keyword is the entire path</li>
+            <li>Each URL counted only once</li>
+            <li>Level with the highest ratio of keyword URLs to total URLs is selected</li>
+        </ol>
+    </div>
+
+    <!-- Show excluded URLs -->
+    <div class="skipped-container">
+        <h3>URLs Excluded from Analysis:</h3>
+        <table class="skipped-table">
+            <tr>
+                <th>URL</th>
+                <th>Reason for Exclusion</th>
+            </tr>
+"""
+
+_KEYWORD_REPORT_CLOSE = """
+    </div>
+</body>
+</html>
+"""
+
+
+def _anchor_row(i, url, reason):
+    """Render one excluded-anchor table row for the HTML report."""
+    bg_color = '#f9f9f9' if i % 2 == 0 else 'white'
+    return f"""
+            <tr style="background-color: {bg_color};">
+                <td class="skipped-anchor">{html.escape(url)}</td>
+                <td>{html.escape(reason)}</td>
+            </tr>"""
+
+
+def _level_stat_item(level, stats, target_level):
+    """Render one level-statistics card for the HTML report."""
+    level_ratio_pct = f"{stats['keyword_ratio'] * 100:.2f}%"
+    is_best = level == target_level
+    best_class = ' level-best' if is_best else ''
+
+    return f"""
+        <div class="level-stat-item{best_class}">
+            <h4>Level {level}{' (BEST)' if is_best else ''}</h4>
+            <p>Matches: {stats['matching_urls']} / Total: {stats['total_unique_urls']}</p>
+            <p>Ratio: {level_ratio_pct}</p>
+            <div class="ratio-bar">
+                <div class="ratio-fill" style="width: {level_ratio_pct};"></div>
+                <div class="ratio-text">{level_ratio_pct}</div>
+            </div>
+        </div>"""
+
+
+def _match_row(i, match, hl_re):
+    """Render one matching-URL entry for the HTML report."""
+    # Escape first, then highlight - raw text and URLs must never reach
+    # the markup, and the href attribute needs quote-safe escaping
+    escaped_url = html.escape(match['url'])
+    highlighted_text = hl_re.sub(_HL_TEMPLATE, html.escape(match['text']))
+    highlighted_url = hl_re.sub(_HL_TEMPLATE, escaped_url)
+
+    path = match.get('path', '')
+    highlighted_path = hl_re.sub(_HL_TEMPLATE, html.escape(path)) if path else ''
+
+    return f"""
+        <div class="match-item">
+            <div class="match-text">{i}. {highlighted_text}</div>
+            <div class="match-url"><a href="{escaped_url}" target="_blank">{highlighted_url}</a></div>
+            <div class="match-norm-url">Normalized: {html.escape(match['normalized_url'])}</div>
+            <div class="match-path">Path: {highlighted_path}</div>
+            <div class="match-tag">Element: &lt;{html.escape(match['tag'])}&gt;</div>
+        </div>"""
+
+
+def _render_keyword_results(search_results, keyword, base_url):
     """
-    Save keyword search results to text and HTML files.
-    
+    Render keyword search results as text and HTML documents.
+
     Args:
         search_results (dict): Dictionary of search results
         keyword (str): The search keyword
         base_url (str): Base URL of the page
-        txt_path (str): Path to save text results
-        html_path (str): Path to save HTML results
+
+    Returns:
+        tuple: (text_content, html_content) strings
     """
+    escaped_keyword = html.escape(keyword)
+
     if not search_results:
-        with open(txt_path, 'w', encoding='utf-8') as f:
-            f.write(f"No matches found for keyword '{keyword}'")
-        
-        with open(html_path, 'w', encoding='utf-8') as f:
-            f.write(f"""<!DOCTYPE html>
+        txt_content = f"No matches found for keyword '{keyword}'"
+        html_content = f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
-    <title>Keyword Search Results - '{keyword}'</title>
+    <title>Keyword Search Results - '{escaped_keyword}'</title>
     <style>
         body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }}
         h1, h2 {{ color: #333; }}
     </style>
 </head>
 <body>
-    <h1>Keyword Search Results - '{keyword}'</h1>
-    <p>No matches found for keyword '{keyword}'</p>
+    <h1>Keyword Search Results - '{escaped_keyword}'</h1>
+    <p>No matches found for keyword '{escaped_keyword}'</p>
 </body>
 </html>
-""")
-        return
-    
+"""
+        return txt_content, html_content
+
     target_level = search_results['target_level']
     best_matches = search_results['best_matches']
     level_stats = search_results.get('level_stats', {})
@@ -672,25 +1228,29 @@ def save_keyword_results(search_results, keyword, base_url, txt_path, html_path)
         ""
     ]
     
-    # Add skipped URLs information
+    # Add skipped URLs information, focusing on URLs with anchors.
+    # Count once and slice lazily instead of materializing the full
+    # filtered list just to show the first few entries.
     skipped_urls = debug_info.get('skipped', {})
-    if skipped_urls:
-        # Focus on URLs with anchors
-        anchor_urls = [(url, reason) for url, reason in skipped_urls.items() if "anchor" in reason.lower()]
-        
-        if anchor_urls:
-            result_lines.append(f"URLs with anchors skipped at this level:")
-            result_lines.append("-" * 40)
-            
-            for i, (url, reason) in enumerate(anchor_urls[:5], 1):
-                result_lines.append(f"{i}. {url}")
-                result_lines.append(f"   Reason: {reason}")
-                result_lines.append("")
-            
-            if len(anchor_urls) > 5:
-                result_lines.append(f"...and {len(anchor_urls) - 5} more URLs with anchors were skipped.")
-            
+    anchor_count = sum(1 for reason in skipped_urls.values() if "anchor" in reason.lower())
+
+    def _anchor_items():
+        return ((url, reason) for url, reason in skipped_urls.items()
+                if "anchor" in reason.lower())
+
+    if anchor_count:
+        result_lines.append(f"URLs with anchors skipped at this level:")
+        result_lines.append("-" * 40)
+
+        for i, (url, reason) in enumerate(islice(_anchor_items(), 5), 1):
+            result_lines.append(f"{i}. {url}")
+            result_lines.append(f"   Reason: {reason}")
             result_lines.append("")
+
+        if anchor_count > 5:
+            result_lines.append(f"...and {anchor_count - 5} more URLs with anchors were skipped.")
+
+        result_lines.append("")
     
     # Add all level statistics
     result_lines.append("Level Statistics:")
@@ -714,47 +1274,19 @@ def save_keyword_results(search_results, keyword, base_url, txt_path, html_path)
         result_lines.append(f"   Path: {item.get('path', 'N/A')}")
         result_lines.append(f"   Tag: {item['tag']}")
         result_lines.append("")
-    
-    # Save to text file
-    with open(txt_path, 'w', encoding='utf-8') as f:
-        f.write("\n".join(result_lines))
-    
-    # Create HTML output
-    with open(html_path, 'w', encoding='utf-8') as f:
-        html_content = f"""<!DOCTYPE html>
+
+    # Create HTML output - collect parts and join once at the end.
+    # Fixed fragments (CSS, ranking rules, closing tags) are module-level
+    # constants; only the dynamic header is formatted per call.
+    parts = []
+    parts.append(f"""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
-    <title>Keyword Search Results - '{keyword}'</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }}
-        h1, h2 {{ color: #333; }}
-        .result-container {{ margin-bottom: 30px; border: 1px solid #ddd; padding: 15px; border-radius: 5px; }}
-        .result-header {{ background-color: #f5f5f5; padding: 10px; margin-bottom: 15px; border-radius: 3px; }}
-        .match-item {{ margin-bottom: 12px; padding: 10px; border-bottom: 1px solid #eee; }}
-        .match-text {{ font-weight: bold; margin-bottom: 5px; }}
-        .match-url {{ color: blue; word-break: break-all; margin-bottom: 3px; }}
-        .match-norm-url {{ color: #555; word-break: break-all; font-style: italic; font-size: 0.9em; margin-bottom: 3px; }}
-        .match-path {{ color: #777; font-family: monospace; margin-bottom: 3px; }}
-        .match-tag {{ color: #666; font-style: italic; margin-top: 5px; }}
-        .highlight {{ background-color: #ffff00; font-weight: bold; }}
-        .stats {{ margin-top: 10px; font-size: 0.9em; color: #555; }}
-        .ratio-bar {{ height: 20px; background-color: #ddd; margin-top: 5px; border-radius: 3px; position: relative; margin-bottom: 15px; }}
-        .ratio-fill {{ height: 100%; background-color: #4CAF50; border-radius: 3px; }}
-        .ratio-text {{ position: absolute; right: 5px; top: 0; font-size: 0.8em; color: #000; }}
-        .rules {{ background-color: #f9f9f9; padding: 10px; border-left: 3px solid #4CAF50; margin: 15px 0; }}
-        .level-stats {{ display: flex; flex-wrap: wrap; gap: 10px; margin-bottom: 20px; }}
-        .level-stat-item {{ border: 1px solid #ddd; padding: 10px; border-radius: 5px; flex-grow: 1; min-width: 200px; }}
-        .level-best {{ background-color: #e8f5e9; }}
-        .skipped-container {{ margin: 20px 0; }}
-        .skipped-table {{ width: 100%; border-collapse: collapse; }}
-        .skipped-table th, .skipped-table td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-        .skipped-table th {{ background-color: #f5f5f5; }}
-        .skipped-anchor {{ background-color: #ffe6e6; }}
-    </style>
-</head>
-<body>
-    <h1>Keyword Search Results - '{keyword}'</h1>
+    <title>Keyword Search Results - '{escaped_keyword}'</title>
+""")
+    parts.append(_KEYWORD_REPORT_STYLE)
+    parts.append(f"""    <h1>Keyword Search Results - '{escaped_keyword}'</h1>
     <div class="result-header">
         <h2>Level {target_level} - {matching_urls} matches found</h2>
         <p>This level has the highest keyword match ratio ({ratio_percentage})</p>
@@ -766,131 +1298,75 @@ def save_keyword_results(search_results, keyword, base_url, txt_path, html_path)
             </div>
         </div>
     </div>
-    
-    <div class="rules">
-        <h3>Ranking Rules Applied:</h3>
-        <ol>
-            <li>Only counting unique URLs after removing query parameters and anchors</li>
-            <li>Only counting URLs with keyword in their path (not in query or fragment)</li>
-            <li>Excluding URLs where the keyword is the entire path</li>
-            <li>Each URL counted only once</li>
-            <li>Level with the highest ratio of keyword URLs to total URLs is selected</li>
-        </ol>
-    </div>
-    
-    <!-- Show excluded URLs -->
-    <div class="skipped-container">
-        <h3>URLs Excluded from Analysis:</h3>
-        <table class="skipped-table">
-            <tr>
-                <th>URL</th>
-                <th>Reason for Exclusion</th>
-            </tr>
-"""
-        
-        # Add excluded URLs with anchors
-        anchor_urls = [(url, reason) for url, reason in skipped_urls.items() if "anchor" in reason.lower()]
-        
-        if anchor_urls:
-            for i, (url, reason) in enumerate(anchor_urls[:10]):
-                bg_color = '#f9f9f9' if i % 2 == 0 else 'white'
-                html_content += f"""
-            <tr style="background-color: {bg_color};">
-                <td class="skipped-anchor">{url}</td>
-                <td>{reason}</td>
-            </tr>"""
-                
-            if len(anchor_urls) > 10:
-                html_content += f"""
+""")
+    parts.append(_KEYWORD_RULES_HTML)
+
+    # Add excluded URLs with anchors (count and generator computed above)
+    if anchor_count:
+        parts.append("".join(_anchor_row(i, url, reason)
+                             for i, (url, reason) in enumerate(islice(_anchor_items(), 10))))
+
+        if anchor_count > 10:
+            parts.append(f"""
             <tr>
                 <td colspan="2" style="text-align: center; font-style: italic;">
-                    And {len(anchor_urls) - 10} more URLs with anchors were excluded...
+                    And {anchor_count - 10} more URLs with anchors were excluded...
                 </td>
-            </tr>"""
-        else:
-            html_content += """
+            </tr>""")
+    else:
+        parts.append("""
             <tr>
                 <td colspan="2" style="text-align: center;">
                     No URLs with anchors were excluded at this level.
                 </td>
-            </tr>"""
-        
-        html_content += """
+            </tr>""")
+
+    parts.append("""
         </table>
     </div>
-    
+
     <h3>Level Statistics:</h3>
     <div class="level-stats">
-"""
-        
-        # Add level statistics
-        for level, stats in sorted(level_stats.items()):
-            level_ratio = stats['keyword_ratio']
-            level_ratio_pct = f"{level_ratio * 100:.2f}%"
-            is_best = level == target_level
-            
-            best_class = ' level-best' if is_best else ''
-            
-            html_content += f"""
-        <div class="level-stat-item{best_class}">
-            <h4>Level {level}{' (BEST)' if is_best else ''}</h4>
-            <p>Matches: {stats['matching_urls']} / Total: {stats['total_unique_urls']}</p>
-            <p>Ratio: {level_ratio_pct}</p>
-            <div class="ratio-bar">
-                <div class="ratio-fill" style="width: {level_ratio_pct};"></div>
-                <div class="ratio-text">{level_ratio_pct}</div>
-            </div>
-        </div>"""
-        
-        html_content += """
+""")
+
+    # Add level statistics
+    parts.append("".join(_level_stat_item(level, stats, target_level)
+                         for level, stats in sorted(level_stats.items())))
+
+    parts.append("""
     </div>
-    
+
     <h3>Matching URLs:</h3>
     <div class="result-container">
-"""
-        
-        if not best_matches:
-            html_content += "<p>No matches found.</p>"
-        else:
-            for i, match in enumerate(best_matches, 1):
-                import re
-                # Highlight the keyword in text, URL, and path
-                highlighted_text = re.sub(
-                    f'(?i)\\b({re.escape(keyword)})\\b', 
-                    r'<span class="highlight">\1</span>', 
-                    match['text']
-                )
-                
-                highlighted_url = re.sub(
-                    f'(?i)\\b({re.escape(keyword)})\\b', 
-                    r'<span class="highlight">\1</span>', 
-                    match['url']
-                )
-                
-                path = match.get('path', '')
-                highlighted_path = re.sub(
-                    f'(?i)\\b({re.escape(keyword)})\\b', 
-                    r'<span class="highlight">\1</span>', 
-                    path
-                ) if path else ''
-                
-                html_content += f"""
-        <div class="match-item">
-            <div class="match-text">{i}. {highlighted_text}</div>
-            <div class="match-url"><a href="{match['url']}" target="_blank">{highlighted_url}</a></div>
-            <div class="match-norm-url">Normalized: {match['normalized_url']}</div>
-            <div class="match-path">Path: {highlighted_path}</div>
-            <div class="match-tag">Element: &lt;{match['tag']}&gt;</div>
-        </div>"""
-        
-        html_content += """
-    </div>
-</body>
-</html>
-"""
-        
-        f.write(html_content)
-    
+""")
+
+    if not best_matches:
+        parts.append("<p>No matches found.</p>")
+    else:
+        hl_re = _get_highlight_regex(keyword)
+        parts.append("".join(_match_row(i, match, hl_re)
+                             for i, match in enumerate(best_matches, 1)))
+
+    parts.append(_KEYWORD_REPORT_CLOSE)
+
+    return "\n".join(result_lines), "".join(parts)
+
+
+def save_keyword_results(search_results, keyword, base_url, txt_path, html_path):
+    """
+    Save keyword search results to text and HTML files.
+
+    Args:
+        search_results (dict): Dictionary of search results
+        keyword (str): The search keyword
+        base_url (str): Base URL of the page
+        txt_path (str): Path to save text results
+        html_path (str): Path to save HTML results
+    """
+    txt_content, html_content = _render_keyword_results(search_results, keyword, base_url)
+    Path(txt_path).write_text(txt_content, encoding='utf-8')
+    Path(html_path).write_text(html_content, encoding='utf-8')
+
 
 async def main():
     if len(sys.argv) < 3:
@@ -901,7 +1377,10 @@ async def main():
     keyword = sys.argv[2]
     output_dir = sys.argv[3] if len(sys.argv) > 3 else None
     
-    results = await scrape_and_search(url, keyword, output_dir)
+    try:
+        results = await scrape_and_search(url, keyword, output_dir)
+    finally:
+        await shutdown()
     print(f"Process complete! Results saved to {results['output_dir']}")
     
     # Display information about the highest level
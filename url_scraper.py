@@ -11,21 +11,163 @@ import os
 import sys
 import json
 import time
+from itertools import count
 from pathlib import Path
 from urllib.parse import urlparse
 import asyncio
-from playwright.async_api import async_playwright
+from bs4 import BeautifulSoup
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-async def scrape_url(url, output_dir=None):
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Warm browser shared by every scrape_url call in the process
+_playwright = None
+_browser = None
+_browser_lock = asyncio.Lock()
+
+# Shared HTTP client for the static fast path, created on first use
+_http_client = None
+
+# Pages with this many script tags or more are assumed to be
+# client-rendered and handed to the browser instead
+_MAX_STATIC_SCRIPT_TAGS = 10
+
+# Per-process counter making default output directories unique: batch
+# scrapes of one domain all start within the same strftime second
+_dir_counter = count(1)
+
+
+async def get_browser():
+    """
+    Return the shared Chromium instance, launching it on first use.
+
+    Browser startup costs several seconds; reusing one warm browser and
+    creating an isolated BrowserContext per URL amortizes that cost
+    across every scrape in the process.
+    """
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is None:
+            _playwright = await async_playwright().start()
+            _browser = await _playwright.chromium.launch(headless=True)
+    return _browser
+
+
+async def shutdown_browser():
+    """Close the shared browser, HTTP client and Playwright at program exit."""
+    global _playwright, _browser, _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    async with _browser_lock:
+        if _browser is not None:
+            await _browser.close()
+            _browser = None
+        if _playwright is not None:
+            await _playwright.stop()
+            _playwright = None
+
+
+async def _fetch_static(url):
+    """
+    Try to fetch a URL over plain HTTP, bypassing the browser.
+
+    Most discovered URLs are server-rendered HTML that doesn't need a
+    JS engine; a straight GET is an order of magnitude cheaper than a
+    Playwright navigation.
+
+    Args:
+        url (str): The URL to fetch
+
+    Returns:
+        str or None: The page HTML, or None when the page should go
+                     through the browser instead (httpx not installed,
+                     request failed, thin response, or script-heavy page
+                     that likely renders client-side).
+    """
+    if httpx is None:
+        return None
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(http2=True, follow_redirects=True,
+                                         timeout=10)
+    try:
+        response = await _http_client.get(url)
+    except httpx.HTTPError:
+        return None
+    if response.status_code != 200:
+        return None
+    html_content = response.text
+    # A tiny body is usually an error stub or a JS bootstrap shell
+    if len(html_content) < 1024:
+        return None
+    if html_content.lower().count('<script') >= _MAX_STATIC_SCRIPT_TAGS:
+        return None
+    return html_content
+
+
+async def _write_text(path, data):
+    """Write text to a file in a worker thread to keep the event loop free."""
+    await asyncio.to_thread(Path(path).write_text, data, encoding='utf-8')
+
+
+def _html_to_text(html_content):
+    """
+    Extract visible text from an HTML document (blocking; run in a thread).
+
+    Prefers selectolax (C-backed Lexbor parser) and falls back to
+    BeautifulSoup when it isn't installed. Script and style contents are
+    stripped first - they are text nodes to a parser but never rendered,
+    and this helper stands in for document.body.innerText.
+    """
+    if HTMLParser is not None:
+        tree = HTMLParser(html_content)
+        tree.strip_tags(['script', 'style'])
+        body = tree.body
+        return body.text(separator='\n', strip=True) if body else ''
+    soup = BeautifulSoup(html_content, 'html.parser')
+    for tag in soup(['script', 'style']):
+        tag.decompose()
+    return soup.get_text(separator='\n', strip=True)
+
+
+def _dump_snapshot(dom_snapshot, dom_path):
+    """Serialize the DOM snapshot to dom_path (blocking; run in a thread)."""
+    if orjson is not None:
+        with open(dom_path, 'wb') as f:
+            f.write(orjson.dumps(dom_snapshot, option=orjson.OPT_INDENT_2))
+    else:
+        # Skip pretty-printing on the stdlib fallback - indenting
+        # roughly doubles both the output size and the encoder work
+        with open(dom_path, 'w', encoding='utf-8') as f:
+            json.dump(dom_snapshot, f, ensure_ascii=False)
+
+
+async def scrape_url(url, output_dir=None, screenshot=True):
     """
     Scrape a URL using Playwright and save the results.
-    
+
     Args:
         url (str): The URL to scrape
         output_dir (str, optional): Directory to save results. If None, a directory will be created
                                     based on the domain name and timestamp.
-    
+        screenshot (bool): Whether to capture a full-page screenshot. Pass
+                           False when only the DOM/text is needed - rendering
+                           and encoding a long page can take seconds.
+
     Returns:
         str: Path to the output directory
     """
@@ -33,121 +175,227 @@ async def scrape_url(url, output_dir=None):
     parsed_url = urlparse(url)
     domain = parsed_url.netloc
     
-    # Create an output directory if not specified
+    # Create an output directory if not specified. The counter keeps
+    # concurrent same-domain scrapes from resolving to one directory and
+    # overwriting each other's artifacts - the timestamp alone only has
+    # second granularity.
     if output_dir is None:
         timestamp = time.strftime("%Y%m%d_%H%M%S")
-        output_dir = f"{domain}_{timestamp}"
+        output_dir = f"{domain}_{timestamp}_{next(_dir_counter)}"
     
     # Create the directory if it doesn't exist
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page()
-        
-        # Navigate to the URL
+
+    # Static fast path: when the caller doesn't need a screenshot, try a
+    # plain HTTP fetch first and only fall back to the browser for pages
+    # that look client-rendered. No DOM snapshot is produced here - there
+    # is no rendered DOM without a browser.
+    if not screenshot:
+        static_html = await _fetch_static(url)
+        if static_html is not None:
+            print(f"Fetched {url} without a browser")
+            page_text = await asyncio.to_thread(_html_to_text, static_html)
+
+            await _write_text(os.path.join(output_dir, "url.txt"), url)
+            await _write_text(os.path.join(output_dir, "page_text.txt"), page_text)
+            await _write_text(os.path.join(output_dir, "page_source.html"), static_html)
+
+            print(f"Scraping completed! Results saved in {output_dir}")
+            return output_dir
+
+    browser = await get_browser()
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
+        page.set_default_navigation_timeout(15000)
+
+        # Navigate to the URL. Don't wait for network idle - ad- and
+        # tracker-heavy pages may never go quiet; DOM content is enough,
+        # with a short best-effort wait for the load event on top.
         print(f"Navigating to {url}...")
-        await page.goto(url, wait_until="networkidle")
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=15000)
+        except PlaywrightTimeoutError:
+            print("Navigation timed out; continuing with what has rendered")
+        try:
+            await page.wait_for_load_state("load", timeout=5000)
+        except PlaywrightTimeoutError:
+            pass
         
-        # Save screenshot
-        screenshot_path = os.path.join(output_dir, "screenshot.png")
-        print(f"Taking screenshot and saving to {screenshot_path}")
-        await page.screenshot(path=screenshot_path, full_page=True)
+        # Save screenshot (skipped entirely when the caller only needs
+        # the DOM/text - the paint + PNG encode dominates on long pages)
+        if screenshot:
+            screenshot_path = os.path.join(output_dir, "screenshot.png")
+            print(f"Taking screenshot and saving to {screenshot_path}")
+            await page.screenshot(path=screenshot_path, full_page=True)
         
-        # Get DOM snapshot as JSON with improved text capture
-        dom_snapshot = await page.evaluate("""() => {
-            function serializeNode(node) {
-                if (!node) return null;
-                
+        # Collect the DOM snapshot, rendered text and HTML source in a
+        # single evaluate call - each extra round-trip re-walks the DOM
+        # and pays CDP marshalling overhead.
+        payload = await page.evaluate("""(includeText) => {
+            // Tags that commonly carry ::before/::after generated content;
+            // probing every element forces extra style resolution.
+            const PSEUDO_TAGS = new Set(['SPAN', 'DIV', 'A', 'LI', 'P']);
+
+            // Serialize one node (no children). Returns null for hidden
+            // elements so their entire subtree is pruned by the caller.
+            function buildNode(node) {
                 const serialized = {
                     nodeType: node.nodeType,
                 };
-                
+
                 if (node.nodeType === Node.ELEMENT_NODE) {
+                    // Resolve the style once; skip hidden subtrees entirely
+                    // so their descendants are never styled or serialized.
+                    const cs = window.getComputedStyle(node);
+                    if (cs.display === 'none' || cs.visibility === 'hidden') {
+                        return null;
+                    }
+
                     serialized.tagName = node.tagName;
                     serialized.attributes = {};
                     for (const attr of node.attributes) {
                         serialized.attributes[attr.name] = attr.value;
                     }
-                    
-                    // Capture the rendered text content for all elements
-                    // This gets text as displayed on the page
-                    const computedStyle = window.getComputedStyle(node);
-                    if (computedStyle.display !== 'none' && computedStyle.visibility !== 'hidden') {
-                        serialized.displayedText = node.innerText || '';
-                    }
-                    
+
+                    // Capture the rendered text content as displayed on the page
+                    serialized.displayedText = node.innerText || '';
+
                     // For special cases like links, capture the href and text specially
                     if (node.tagName === 'A') {
                         serialized.linkText = node.textContent || '';
                         serialized.linkHref = node.href || '';
                     }
+
+                    // Check for CSS-generated content
+                    if (PSEUDO_TAGS.has(node.tagName)) {
+                        try {
+                            const before = window.getComputedStyle(node, '::before').content;
+                            const after = window.getComputedStyle(node, '::after').content;
+                            if (before && before !== 'none') serialized.beforeContent = before;
+                            if (after && after !== 'none') serialized.afterContent = after;
+                        } catch (e) {
+                            // Ignore errors from getComputedStyle
+                        }
+                    }
                 } else if (node.nodeType === Node.TEXT_NODE) {
                     serialized.textContent = node.textContent || '';
                 } else if (node.nodeType === Node.COMMENT_NODE) {
                     serialized.comment = node.textContent || '';
                 }
-                
-                // Check for CSS-generated content
-                if (node.nodeType === Node.ELEMENT_NODE) {
-                    try {
-                        const before = window.getComputedStyle(node, '::before').content;
-                        const after = window.getComputedStyle(node, '::after').content;
-                        if (before && before !== 'none') serialized.beforeContent = before;
-                        if (after && after !== 'none') serialized.afterContent = after;
-                    } catch (e) {
-                        // Ignore errors from getComputedStyle
-                    }
-                }
-                
-                if (node.childNodes.length > 0) {
-                    serialized.children = [];
+
+                return serialized;
+            }
+
+            // Walk the tree with an explicit worklist instead of recursion:
+            // deep documents would otherwise pay one JS call frame per node
+            // and risk blowing the stack. Child order is preserved because
+            // each child is attached to its parent's array as it is built,
+            // independent of the order subtrees are popped.
+            function serializeTree(root) {
+                if (!root) return null;
+                const rootSerialized = buildNode(root);
+                if (!rootSerialized) return null;
+
+                const stack = [[root, rootSerialized]];
+                while (stack.length > 0) {
+                    const [node, serialized] = stack.pop();
                     for (const child of node.childNodes) {
-                        const serializedChild = serializeNode(child);
-                        if (serializedChild) {
-                            serialized.children.push(serializedChild);
+                        const serializedChild = buildNode(child);
+                        if (!serializedChild) continue;  // hidden: subtree never pushed
+                        if (!serialized.children) serialized.children = [];
+                        serialized.children.push(serializedChild);
+                        if (child.childNodes.length > 0) {
+                            stack.push([child, serializedChild]);
                         }
                     }
                 }
-                
-                return serialized;
+                return rootSerialized;
             }
-            
-            return serializeNode(document.documentElement);
-        }""")
-        
-        # Save DOM snapshot to file
+
+            return {
+                dom: serializeTree(document.documentElement),
+                // Skipped when the caller extracts text from the HTML
+                // locally - innerText is a big string to CDP-marshal
+                text: includeText ? document.body.innerText : '',
+                html: document.documentElement.outerHTML
+            };
+        }""", HTMLParser is None)
+
+        dom_snapshot = payload['dom']
+        html_content = payload['html']
+        if HTMLParser is not None:
+            # Parse the HTML we already have with the C-backed parser
+            # instead of shipping document.body.innerText over CDP
+            page_text = await asyncio.to_thread(_html_to_text, html_content)
+        else:
+            page_text = payload['text']
+
+        # Save the artifacts from worker threads - the snapshot and HTML
+        # can be megabytes, and writing them on the event loop thread
+        # would stall concurrent scrapes in scrape_urls.
         dom_path = os.path.join(output_dir, "dom_snapshot.json")
         print(f"Saving DOM snapshot to {dom_path}")
-        with open(dom_path, 'w', encoding='utf-8') as f:
-            json.dump(dom_snapshot, f, ensure_ascii=False, indent=2)
-        
+        await asyncio.to_thread(_dump_snapshot, dom_snapshot, dom_path)
+
         # Save URL to text file
         url_path = os.path.join(output_dir, "url.txt")
         print(f"Saving URL to {url_path}")
-        with open(url_path, 'w', encoding='utf-8') as f:
-            f.write(url)
-        
-        # Extract and save full page text
-        page_text = await page.evaluate("() => document.body.innerText")
+        await _write_text(url_path, url)
+
+        # Save full page text
         text_path = os.path.join(output_dir, "page_text.txt")
         print(f"Saving full page text to {text_path}")
-        with open(text_path, 'w', encoding='utf-8') as f:
-            f.write(page_text)
-            
+        await _write_text(text_path, page_text)
+
         # Also save HTML content for reference
-        html_content = await page.content()
         html_path = os.path.join(output_dir, "page_source.html")
         print(f"Saving HTML source to {html_path}")
-        with open(html_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        await browser.close()
-    
+        await _write_text(html_path, html_content)
+    finally:
+        # Close the context, not the browser - it stays warm for reuse
+        await context.close()
+
     print(f"Scraping completed! Results saved in {output_dir}")
     return output_dir
 
 
+async def scrape_urls(urls, max_concurrency=5, screenshot=False):
+    """
+    Scrape several URLs concurrently using the shared warm browser.
+
+    Fans out scrape_url calls with asyncio.gather under a semaphore so at
+    most max_concurrency pages are in flight at once, overlapping network
+    and render latency across URLs instead of paying it serially.
+
+    Args:
+        urls (list): The URLs to scrape
+        max_concurrency (int): Maximum number of concurrent scrapes
+        screenshot (bool): Whether to capture a screenshot per URL.
+                           Defaults to False - crawl-style batches rarely
+                           need one, and skipping it lets static pages be
+                           fetched without a browser at all.
+
+    Returns:
+        list: One entry per URL, in order - the output directory for
+              successful scrapes or the exception raised for failed ones.
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def bound(u):
+        async with sem:
+            return await scrape_url(u, screenshot=screenshot)
+
+    results = await asyncio.gather(*(bound(u) for u in urls), return_exceptions=True)
+
+    # Log failures instead of letting one bad URL abort the batch
+    for u, result in zip(urls, results):
+        if isinstance(result, Exception):
+            print(f"Failed to scrape {u}: {result}")
+
+    return results
+
+
 def main():
     # Check if a URL was provided
     if len(sys.argv) < 2:
@@ -156,8 +404,14 @@ def main():
     
     url = sys.argv[1]
     output_dir = sys.argv[2] if len(sys.argv) > 2 else None
-    
-    asyncio.run(scrape_url(url, output_dir))
+
+    async def run():
+        try:
+            await scrape_url(url, output_dir)
+        finally:
+            await shutdown_browser()
+
+    asyncio.run(run())
 
 
 if __name__ == "__main__":